@@ -1,8 +1,21 @@
 from PIL import Image, ImageDraw, ImageFont
 import argparse
+import atexit
+import concurrent.futures
+import functools
+import itertools
+import json
+import logging
 import subprocess
 import os
 import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Extra FFmpeg args: the banner and per-frame progress are megabytes of stdout
+# churn over a whole run, so only real errors are emitted
+FFMPEG_LOG_ARGS = ["-hide_banner", "-loglevel", "error"]
 
 # Path to FFmpeg executable (update if needed)
 FFMPEG_PATH = r"C:\ffmpeg-master-latest-win64-gpl-shared\bin\ffmpeg.exe"
@@ -14,6 +27,22 @@ TARGET_HEIGHT = 1080
 # Temporary directory name
 TEMP_DIR = "temp"
 
+# Frame rate for still-image segments (the frame is static, so 2fps is plenty)
+SEGMENT_FPS = 2
+
+# Per-image duration snapped to whole milliseconds. Raw float division
+# (e.g. 10/3) gives times whose float error accumulates across segments and
+# makes FFmpeg resample audio timestamps at every boundary
+def per_image_duration(total_duration, num_images):
+    return (total_duration * 1000 // num_images) / 1000
+
+# Per-image duration for the segment pipeline, snapped to the segment frame
+# grid. At 2fps a millisecond-precise duration still rounds the video track up
+# to the next whole frame while the audio trim cuts exactly, and the concat
+# demuxer pads the difference at every boundary with silence
+def per_image_segment_duration(total_duration, num_images):
+    return max(1, round(per_image_duration(total_duration, num_images) * SEGMENT_FPS)) / SEGMENT_FPS
+
 # Check if FFmpeg is available
 def check_ffmpeg():
     if not os.path.exists(FFMPEG_PATH) and not shutil.which(FFMPEG_PATH):
@@ -29,187 +58,329 @@ def resolve_path(path, script_dir):
         raise FileNotFoundError(f"File '{abs_path}' not found.")
     return abs_path
 
-# Ensure temp directory exists
+# Ensure temp directory exists; prefer RAM-backed storage (tmpfs) where
+# available so the intermediate images/audio/segments never touch disk. The
+# tmpfs directory is created per run — a fixed shared path would let
+# concurrent runs (or other users) clobber each other's segment files — and
+# removed on exit so the intermediates don't pile up in RAM until reboot
 def ensure_temp_dir(script_dir):
+    if os.path.isdir("/dev/shm"):
+        temp_path = tempfile.mkdtemp(prefix=f"video_generator_{TEMP_DIR}_", dir="/dev/shm")
+        atexit.register(shutil.rmtree, temp_path, ignore_errors=True)
+        return temp_path
     temp_path = os.path.join(script_dir, TEMP_DIR)
     if not os.path.exists(temp_path):
         os.makedirs(temp_path)
     return temp_path
 
-# Process image with fixed resizing, transformation, text overlay, and caption
-def process_image(image_path, text, caption, transformation, index, temp_dir):
+# Load the overlay font once; truetype() parses the TTF and builds glyph
+# tables on every call, so cache it for the whole run
+@functools.lru_cache(maxsize=None)
+def get_overlay_font():
+    # Use a larger font for better visibility
+    try:
+        return ImageFont.truetype("arial.ttf", 40)
+    except:
+        return ImageFont.load_default()
+
+# Pre-render the text and caption overlays as RGBA sprites with paste positions.
+# Both strings are constant across the run, so the font rasterization and layout
+# happen once here instead of once per image.
+def render_overlays(text, caption):
+    font = get_overlay_font()
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    overlays = []
+
+    # Original text (white, top-left)
+    if text:
+        bbox = measure.textbbox((0, 0), text, font=font)
+        sprite = Image.new("RGBA", (bbox[2] + 1, bbox[3] + 1), (0, 0, 0, 0))
+        ImageDraw.Draw(sprite).text((0, 0), text, font=font, fill="white")
+        overlays.append((sprite, (10, 10)))
+
+    # Caption (black, bottom center) with a semi-transparent background rectangle
+    if caption:
+        bbox = measure.textbbox((0, 0), caption, font=font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        text_x = (TARGET_WIDTH - text_width) // 2
+        text_y = TARGET_HEIGHT - text_height - 20
+        sprite = Image.new(
+            "RGBA",
+            (text_width + 20, max(text_height + 10, bbox[3] + 5)),
+            (0, 0, 0, 0),
+        )
+        sprite_draw = ImageDraw.Draw(sprite)
+        sprite_draw.rectangle([(0, 0), (text_width + 19, text_height + 9)], fill=(255, 255, 255, 128))
+        sprite_draw.text((10, 5), caption, font=font, fill="black")
+        overlays.append((sprite, (text_x - 10, text_y - 5)))
+
+    return overlays
+
+# Process image with fixed resizing, transformation, and pre-rendered overlays;
+# returns the in-memory PIL image so callers decide whether it ever hits disk
+def process_image(image_path, overlays, transformation):
     try:
-        print(f"Processing image: {image_path}")
+        logger.info("Processing image: %s", image_path)
         img = Image.open(image_path)
-        
-        # Resize to fixed target size (1920x1080) before transformation
-        img = img.resize((TARGET_WIDTH, TARGET_HEIGHT), Image.Resampling.LANCZOS)
 
-        # Apply transformation on the fixed-size image
+        # For JPEGs, let libjpeg decode at reduced scale (and grayscale as
+        # planar Y). draft() never undershoots the requested size, so the
+        # LANCZOS resize below still produces the exact target
+        if img.format == "JPEG":
+            draft_mode = "L" if transformation == "grayscale" else None
+            if transformation == "rotate":
+                # The image is transposed before the resize, so swap the axes
+                img.draft(draft_mode, (TARGET_HEIGHT, TARGET_WIDTH))
+            else:
+                img.draft(draft_mode, (TARGET_WIDTH, TARGET_HEIGHT))
+
+        # Apply the transformation on the source so the LANCZOS resize below is
+        # the only resampling pass. convert("L") is a single C pass and leaves
+        # one channel for the resize and save, which beats converting after the
+        # resize (or a NumPy/OpenCV matmul kept in RGB) by a factor of ~3
         if transformation == "grayscale":
             img = img.convert("L")
         elif transformation == "rotate":
-            img = img.rotate(90)
-        elif transformation == "resize":  # Redundant but kept for consistency
-            img = img.resize((TARGET_WIDTH, TARGET_HEIGHT))
-
-        # Convert to RGBA for transparency support before drawing
-        img = img.convert("RGBA")
-        draw = ImageDraw.Draw(img)
-        
-        # Use a larger font for better visibility
-        try:
-            font = ImageFont.truetype("arial.ttf", 40)
-        except:
-            font = ImageFont.load_default()
-
-        # Add original text (white, top-left)
-        if text:
-            draw.text((10, 10), text, font=font, fill="white")
-
-        # Add caption (black, bottom center) with a background rectangle
-        if caption:
-            caption_text = caption
-            bbox = draw.textbbox((0, 0), caption_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            text_x = (TARGET_WIDTH - text_width) // 2
-            text_y = TARGET_HEIGHT - text_height - 20
-
-            # Draw semi-transparent white rectangle behind text
-            rect_x0 = text_x - 10
-            rect_y0 = text_y - 5
-            rect_x1 = text_x + text_width + 10
-            rect_y1 = text_y + text_height + 5
-            draw.rectangle(
-                [(rect_x0, rect_y0), (rect_x1, rect_y1)],
-                fill=(255, 255, 255, 128)  # Semi-transparent white
-            )
-
-            # Draw black caption text
-            draw.text((text_x, text_y), caption_text, font=font, fill="black")
-
-        # Convert back to RGB for saving as JPG
-        img = img.convert("RGB")
-        temp_image = os.path.join(temp_dir, f"temp_image_{index:02d}.jpg")
-        img.save(temp_image)
-        print(f"Saved processed image: {temp_image} at {TARGET_WIDTH}x{TARGET_HEIGHT}")
-        return temp_image
+            # transpose is a plain memory reshuffle; rotate(90) runs a full
+            # affine resample and crops to the original canvas
+            img = img.transpose(Image.Transpose.ROTATE_90)
+        # "resize" needs no extra step: the resize below already hits the target
+
+        # Resize to fixed target size (1920x1080)
+        img = img.resize((TARGET_WIDTH, TARGET_HEIGHT), Image.Resampling.LANCZOS)
+
+        # Paste the pre-rendered overlays; each sprite doubles as its own
+        # alpha mask, so blending only touches the sprite-sized regions.
+        # Grayscale images stay in "L" mode — the overlays are achromatic, so
+        # expanding to RGB would just triple the JPEG encode work
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        for sprite, position in overlays:
+            img.paste(sprite, position, sprite)
+
+        logger.debug("Processed image: %s at %dx%d", image_path, TARGET_WIDTH, TARGET_HEIGHT)
+        return img
     except Exception as e:
-        print(f"Error in process_image: {str(e)}")
+        logger.error("Error in process_image: %s", e)
         raise
 
-# Check for audio stream in a file
-def check_audio_stream(file_path):
+# Probe streams and format of a file with a single cached ffprobe call. Keyed
+# on (path, mtime) so repeated queries for the same file (e.g. one music file
+# shared by several segments) don't each fork an ffprobe process.
+@functools.lru_cache(maxsize=None)
+def _probe_media(file_path, mtime):
     ffprobe_path = FFMPEG_PATH.replace("ffmpeg.exe", "ffprobe.exe")
-    cmd = [ffprobe_path, "-v", "error", "-show_streams", "-select_streams", "a", file_path]
+    cmd = [
+        ffprobe_path, "-v", "error", "-print_format", "json",
+        "-show_streams", "-show_format", file_path
+    ]
     result = subprocess.run(cmd, capture_output=True, text=True)
-    if "STREAM" in result.stdout:
-        print(f"Audio stream confirmed in {file_path}")
+    if result.returncode != 0:
+        logger.error("Error probing %s - Exit code: %d, ffprobe stderr: %s", file_path, result.returncode, result.stderr)
+        raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+    return json.loads(result.stdout)
+
+def probe_media(file_path):
+    return _probe_media(file_path, os.path.getmtime(file_path))
+
+# Check for audio stream in a file
+def check_audio_stream(file_path):
+    # A missing or unreadable file means "no audio" here, as in the original
+    # ffprobe text scrape; duration lookups still propagate the failure
+    try:
+        streams = probe_media(file_path).get("streams", [])
+    except (OSError, subprocess.CalledProcessError):
+        streams = []
+    if any(stream.get("codec_type") == "audio" for stream in streams):
+        logger.debug("Audio stream confirmed in %s", file_path)
         return True
-    print(f"Warning: No audio stream detected in {file_path}")
+    logger.warning("No audio stream detected in %s", file_path)
     return False
 
-# Create video segment with image and audio
-def create_image_video_with_audio(image_path, music_path, duration, output_path, start_time, index, temp_dir):
-    adjusted_music = adjust_music(music_path, duration, start_time, index, temp_dir)
+# Create video segment from an in-memory image and already-trimmed audio. The
+# frame is piped to FFmpeg's stdin as raw pixels, so no intermediate JPEG is
+# encoded or decoded.
+def create_image_video_with_audio(img, adjusted_music, duration, output_path, ffmpeg_threads=0):
+    # Low input/output framerate: the frame is static, so encoding it at 25fps
+    # just pushes identical frames through libx264. 2fps cuts that work ~12x.
+    raw_pix_fmt = "gray" if img.mode == "L" else "rgb24"
     cmd = [
-        FFMPEG_PATH, "-y", "-loop", "1", "-i", image_path,
+        FFMPEG_PATH, "-y", *FFMPEG_LOG_ARGS, "-f", "rawvideo", "-pix_fmt", raw_pix_fmt,
+        "-s", f"{TARGET_WIDTH}x{TARGET_HEIGHT}", "-framerate", str(SEGMENT_FPS), "-i", "-",
         "-i", adjusted_music, "-c:v", "libx264", "-c:a", "mp3",
-        "-b:a", "192k", "-map", "0:v:0", "-map", "1:a:0", "-t", str(duration),
-        "-pix_fmt", "yuv420p", "-s", f"{TARGET_WIDTH}x{TARGET_HEIGHT}", output_path
+        "-b:a", "192k", "-map", "0:v:0", "-map", "1:a:0", "-t", f"{duration:.3f}",
+        "-r", str(SEGMENT_FPS), "-tune", "stillimage", "-preset", "ultrafast", "-crf", "30",
+        # One GOP per segment: only the first frame is coded fully, the rest
+        # become near-empty P-frames; no motion search on identical frames
+        "-g", "9999", "-keyint_min", "9999", "-sc_threshold", "0",
+        "-bf", "0", "-refs", "1", "-x264-params", "me=dia:subme=1:trellis=0",
+        "-threads", str(ffmpeg_threads),
+        "-pix_fmt", "yuv420p", output_path
     ]
-    try:
-        print(f"Creating segment with command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"Created segment: {output_path}\nFFmpeg stdout: {result.stdout}")
-        if not check_audio_stream(output_path):
-            raise RuntimeError(f"Audio missing in segment {output_path}. FFmpeg stderr: {result.stderr}")
-        return adjusted_music
-    except subprocess.CalledProcessError as e:
-        print(f"Error creating {output_path} - Exit code: {e.returncode}, FFmpeg stderr: {e.stderr}")
-        raise
+    logger.debug("Creating segment with command: %r", cmd)
+    frame = img.tobytes()
+    # duration is snapped to the frame grid, so this is an exact frame count
+    num_frames = max(1, round(duration * SEGMENT_FPS))
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = proc.communicate(input=frame * num_frames)
+    if proc.returncode != 0:
+        logger.error("Error creating %s - Exit code: %d, FFmpeg stderr: %s", output_path, proc.returncode, stderr.decode(errors="replace"))
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    logger.info("Created segment: %s", output_path)
+    if not check_audio_stream(output_path):
+        raise RuntimeError(f"Audio missing in segment {output_path}. FFmpeg stderr: {stderr.decode(errors='replace')}")
+    return output_path
 
 # Concatenate video segments
 def concatenate_videos(video_paths, output_path, temp_dir):
+    # Unlink any previous output before FFmpeg (or the hardlink below) writes:
+    # a leftover file may be hardlinked to a segment from an earlier run, and
+    # truncating it in place would corrupt that segment while it is an input
+    if os.path.exists(output_path):
+        os.remove(output_path)
     if len(video_paths) == 1:
-        shutil.copy(video_paths[0], output_path)
-        print(f"Copied single video to: {output_path}")
+        # Hardlink instead of copying: O(1) and zero bytes moved. Falls back
+        # to a copy across filesystems or where links aren't supported
+        try:
+            os.link(video_paths[0], output_path)
+        except OSError:
+            shutil.copy(video_paths[0], output_path)
+        logger.info("Copied single video to: %s", output_path)
         return os.path.join(temp_dir, "video_list.txt")
     list_file = os.path.join(temp_dir, "video_list.txt")
     with open(list_file, "w") as f:
         for video in video_paths:
             f.write(f"file '{os.path.abspath(video)}'\n")
     
-    cmd = [FFMPEG_PATH, "-y", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output_path]
+    cmd = [FFMPEG_PATH, "-y", *FFMPEG_LOG_ARGS, "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output_path]
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"Concatenated video: {output_path}\nFFmpeg stdout: {result.stdout}")
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        logger.info("Concatenated video: %s", output_path)
         if not check_audio_stream(output_path):
             raise RuntimeError(f"Audio missing in concatenated video {output_path}")
         return list_file
     except subprocess.CalledProcessError as e:
-        print(f"Error in concatenate_videos - Exit code: {e.returncode}, FFmpeg stderr: {e.stderr}")
+        logger.error("Error in concatenate_videos - Exit code: %d, FFmpeg stderr: %s", e.returncode, e.stderr)
         raise
 
 # Get duration of a file
 def get_audio_duration(file_path):
-    ffprobe_path = FFMPEG_PATH.replace("ffmpeg.exe", "ffprobe.exe")
-    cmd = [
-        ffprobe_path, "-v", "error", "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1", file_path
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    duration = float(result.stdout.strip())
-    print(f"Duration of {file_path}: {duration} seconds")
+    duration = float(probe_media(file_path)["format"]["duration"])
+    logger.debug("Duration of %s: %s seconds", file_path, duration)
     return duration
 
-# Adjust music for segment
-def adjust_music(music_path, duration, start_time, index, temp_dir):
+# Start trimming music for a segment without blocking; returns the Popen and
+# the output path so callers can overlap the trim with other work
+def start_adjust_music(music_path, duration, start_time, index, temp_dir, ffmpeg_threads=0):
     music_duration = get_audio_duration(music_path)
     adjusted_path = os.path.join(temp_dir, f"adjusted_music_{index:02d}.mp3")
-    cmd = [
-        FFMPEG_PATH, "-y", "-i", music_path, "-ss", str(start_time),
-        "-t", str(duration), "-vn", "-c:a", "mp3", "-b:a", "192k", adjusted_path
-    ]
+    streams = probe_media(music_path).get("streams", [])
+    codec = next((s.get("codec_name") for s in streams if s.get("codec_type") == "audio"), None)
+    cmd = [FFMPEG_PATH, "-y", *FFMPEG_LOG_ARGS]
     if start_time + duration > music_duration:
-        print(f"Warning: Music {music_path} is shorter ({music_duration}s) than required ({start_time}+{duration}s), looping applied")
-        cmd.insert(4, "-stream_loop")
-        cmd.insert(5, "-1")
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"Adjusted music: {adjusted_path}\nFFmpeg stdout: {result.stdout}")
-        if not check_audio_stream(adjusted_path):
-            raise RuntimeError(f"Adjusted music {adjusted_path} has no audio")
-        return adjusted_path
-    except subprocess.CalledProcessError as e:
-        print(f"Error in adjust_music - Exit code: {e.returncode}, FFmpeg stderr: {e.stderr}")
-        raise
+        logger.warning("Music %s is shorter (%ss) than required (%s+%ss), looping applied", music_path, music_duration, start_time, duration)
+        cmd += ["-stream_loop", "-1"]
+    # -ss before -i seeks on the input instead of decoding up to start_time
+    cmd += ["-ss", f"{start_time:.3f}", "-i", music_path, "-t", f"{duration:.3f}", "-vn"]
+    if codec == "mp3":
+        # Source is already mp3: trim by stream copy, skipping the re-encode
+        cmd += ["-c:a", "copy"]
+    else:
+        cmd += ["-c:a", "mp3", "-b:a", "192k"]
+    cmd += ["-threads", str(ffmpeg_threads), adjusted_path]
+    logger.debug("Adjusting music with command: %r", cmd)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return proc, adjusted_path
 
-# Attach audio to video
-def attach_audio_to_video(video_path, audio_path, output_path, duration):
-    cmd = [
-        FFMPEG_PATH, "-y", 
-        "-i", video_path, 
-        "-i", audio_path,
-        "-c:v", "copy",          # Copy video stream
-        "-c:a", "copy",          # Copy MP3 audio directly
-        "-map", "0:v:0",         # Map video from first input
-        "-map", "1:a:0",         # Map audio from second input
-        "-t", str(duration),     # Set duration
-        "-pix_fmt", "yuv420p",   # Ensure video compatibility
-        output_path
+# Collect a trim started by start_adjust_music
+def wait_adjust_music(proc, adjusted_path):
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        logger.error("Error in adjust_music - Exit code: %d, FFmpeg stderr: %s", proc.returncode, stderr)
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, stdout, stderr)
+    logger.debug("Adjusted music: %s", adjusted_path)
+    if not check_audio_stream(adjusted_path):
+        raise RuntimeError(f"Adjusted music {adjusted_path} has no audio")
+    return adjusted_path
+
+# Build the final video with a single FFmpeg invocation (one encode, no intermediates)
+def build_video_single_pass(image_paths, music_paths, args, temp_dir):
+    overlays = render_overlays(args.text if args.text else None, args.caption)
+    duration_per_image = per_image_duration(args.duration, len(image_paths))
+    n = len(image_paths)
+    cmd = [FFMPEG_PATH, "-y", *FFMPEG_LOG_ARGS]
+    filter_parts = []
+    for i, image_path in enumerate(image_paths):
+        img = process_image(image_path, overlays, args.transformation)
+        # PPM is a raw header-plus-pixels dump, so the save is a plain write
+        # and FFmpeg's read skips a JPEG decode; each file is read exactly once
+        temp_image = os.path.join(temp_dir, f"temp_image_{i + 1:02d}.ppm")
+        img.save(temp_image)
+        cmd += ["-loop", "1", "-t", f"{duration_per_image:.3f}", "-i", temp_image]
+        filter_parts.append(f"[{i}:v]scale={TARGET_WIDTH}:{TARGET_HEIGHT},setsar=1[v{i}]")
+    # Open each distinct music file once and cut the per-segment pieces with
+    # atrim, instead of adding one input (and one decoder) per segment
+    music_inputs = []
+    music_index = {}
+    music_trim_ends = {}
+    audio_labels = []
+    for i in range(n):
+        music_path = music_paths[i % len(music_paths)]
+        if music_path not in music_index:
+            music_index[music_path] = n + len(music_inputs)
+            music_inputs.append(music_path)
+        start_time = i * duration_per_image
+        trim_end = start_time + duration_per_image
+        music_trim_ends[music_path] = max(music_trim_ends.get(music_path, 0), trim_end)
+        filter_parts.append(
+            f"[{music_index[music_path]}:a]atrim=start={start_time:.3f}:duration={duration_per_image:.3f},"
+            f"asetpts=PTS-STARTPTS[a{i}]"
+        )
+        audio_labels.append(f"[a{i}]")
+    for music_path in music_inputs:
+        # Loop inputs whose furthest trim reaches past their end, otherwise
+        # atrim just runs out of samples and the segment goes silent
+        music_duration = get_audio_duration(music_path)
+        if music_trim_ends[music_path] > music_duration:
+            logger.warning("Music %s is shorter (%ss) than required (%ss), looping applied",
+                           music_path, music_duration, music_trim_ends[music_path])
+            cmd += ["-stream_loop", "-1"]
+        cmd += ["-i", music_path]
+    filter_parts.append("".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[v]")
+    filter_parts.append("".join(audio_labels) + f"concat=n={n}:v=0:a=1[a]")
+    cmd += [
+        "-filter_complex", ";".join(filter_parts),
+        "-map", "[v]", "-map", "[a]",
+        "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", "-b:a", "192k",
+        "-pix_fmt", "yuv420p", "-t", str(args.duration), args.output
     ]
     try:
-        print(f"Attaching audio with command: {' '.join(cmd)}")
+        logger.debug("Building video with command: %r", cmd)
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(f"Final video created: {output_path}\nFFmpeg stdout: {result.stdout}\nFFmpeg stderr: {result.stderr}")
-        if not check_audio_stream(output_path):
-            raise RuntimeError(f"Audio missing in final video {output_path}")
+        logger.info("Created video: %s", args.output)
+        if not check_audio_stream(args.output):
+            raise RuntimeError(f"Audio missing in final video {args.output}. FFmpeg stderr: {result.stderr}")
     except subprocess.CalledProcessError as e:
-        print(f"Error in attach_audio_to_video - Exit code: {e.returncode}, FFmpeg stderr: {e.stderr}")
+        logger.error("Error in build_video_single_pass - Exit code: %d, FFmpeg stderr: %s", e.returncode, e.stderr)
         raise
 
+# Build one image+music segment end to end (runs in a worker thread)
+def build_segment(i, image_path, music_path, start_time, overlays, args, temp_dir):
+    # Cap FFmpeg threads so parallel segment encodes don't oversubscribe cores
+    ffmpeg_threads = max(1, (os.cpu_count() or 1) // len(args.images))
+    duration_per_image = per_image_segment_duration(args.duration, len(args.images))
+    # The music trim shares no inputs with the image work, so run it in the
+    # background while Pillow decodes, resizes, and overlays the image
+    music_proc, adjusted_path = start_adjust_music(
+        music_path, duration_per_image, start_time, i + 1, temp_dir, ffmpeg_threads
+    )
+    img = process_image(image_path, overlays, args.transformation)
+    adjusted_music = wait_adjust_music(music_proc, adjusted_path)
+    temp_video = os.path.join(temp_dir, f"segment_{i + 1}.mp4")
+    create_image_video_with_audio(img, adjusted_music, duration_per_image, temp_video, ffmpeg_threads)
+    return temp_video
+
 def main():
     parser = argparse.ArgumentParser(description="Generate a video from images and music with text overlay and caption.")
     parser.add_argument("-i", "--images", nargs="+", required=True, help="Paths to input images.")
@@ -219,13 +390,18 @@ def main():
     parser.add_argument("-tr", "--transformation", choices=["grayscale", "rotate", "resize"], required=True, help="Transformation for images.")
     parser.add_argument("-d", "--duration", type=int, default=10, help="Total video duration in seconds.")
     parser.add_argument("-o", "--output", default="final_video.mp4", help="Output video file path.")
+    parser.add_argument("--segment-pipeline", action="store_true",
+                        help="Use the per-segment pipeline (one FFmpeg run per image) instead of a single invocation.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable debug logging (commands, per-file details).")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s: %(message)s")
+
     # Check FFmpeg
     try:
         check_ffmpeg()
     except RuntimeError as e:
-        print(e)
+        logger.error(e)
         return
 
     # Resolve paths
@@ -235,48 +411,57 @@ def main():
         image_paths = [resolve_path(img, script_dir) for img in args.images]
         music_paths = [resolve_path(music, script_dir) for music in args.musics]
     except FileNotFoundError as e:
-        print(e)
+        logger.error(e)
         return
 
-    text = args.text if args.text else None
-    duration_per_image = args.duration / len(image_paths)
-    print(f"Duration per image: {duration_per_image} seconds")
+    duration_per_image = per_image_duration(args.duration, len(image_paths))
+    logger.info("Duration per image: %s seconds", duration_per_image)
 
-    # Process images and create segments
-    temp_videos = []
-    for i, image_path in enumerate(image_paths):
-        music_path = music_paths[i % len(music_paths)]
-        start_time = i * duration_per_image
-        temp_image = process_image(image_path, text, args.caption, args.transformation, i + 1, temp_dir)
-        temp_video = os.path.join(temp_dir, f"segment_{i + 1}.mp4")
-        temp_music = create_image_video_with_audio(
-            temp_image, music_path, duration_per_image, temp_video, start_time, i + 1, temp_dir
-        )
-        temp_videos.append(temp_video)
+    # Default path: one FFmpeg invocation does scale+concat+audio in a single encode
+    if not args.segment_pipeline:
+        build_video_single_pass(image_paths, music_paths, args, temp_dir)
+        final_duration = get_audio_duration(args.output)
+        logger.info("Video saved to: %s with duration %ss", os.path.abspath(args.output), final_duration)
+        return
 
-    # Concatenate videos
-    concatenated_video = os.path.join(temp_dir, "concatenated.mp4")
-    list_file = concatenate_videos(temp_videos, concatenated_video, temp_dir)
+    # Process images and create segments in parallel (one worker per segment).
+    # Threads are enough here: the heavy work happens in FFmpeg subprocesses
+    # and in Pillow's C code, both of which run without holding the GIL, so
+    # worker processes would only add fork and pickling overhead.
+    overlays = render_overlays(args.text if args.text else None, args.caption)
+    segment_music = [music_paths[i % len(music_paths)] for i in range(len(image_paths))]
+    segment_duration = per_image_segment_duration(args.duration, len(image_paths))
+    segment_starts = [i * segment_duration for i in range(len(image_paths))]
+    max_workers = min(len(image_paths), os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        temp_videos = list(executor.map(
+            build_segment, range(len(image_paths)), image_paths, segment_music,
+            segment_starts, itertools.repeat(overlays), itertools.repeat(args),
+            itertools.repeat(temp_dir)
+        ))
 
-    # Extract background music from concatenated video
-    extracted_audio = os.path.join(temp_dir, "extracted_audio.mp3")
-    cmd_extract = [FFMPEG_PATH, "-y", "-i", concatenated_video, "-vn", "-c:a", "mp3", "-b:a", "192k", extracted_audio]
-    result = subprocess.run(cmd_extract, check=True, capture_output=True, text=True)
-    print(f"Extracted background music: {extracted_audio}\nFFmpeg stdout: {result.stdout}")
-    if not check_audio_stream(extracted_audio):
-        raise RuntimeError(f"Extracted audio {extracted_audio} has no audio")
+    # Concatenate videos; the segments already carry the final audio, so cap
+    # the result to the requested duration with a pure stream copy
+    concatenated_video = os.path.join(temp_dir, "concatenated.mp4")
+    concatenate_videos(temp_videos, concatenated_video, temp_dir)
 
-    # Attach extracted music to video
     final_video = args.output
-    attach_audio_to_video(concatenated_video, extracted_audio, final_video, args.duration)
+    cmd_cap = [
+        FFMPEG_PATH, "-y", *FFMPEG_LOG_ARGS, "-i", concatenated_video,
+        "-t", str(args.duration), "-c", "copy", final_video
+    ]
+    subprocess.run(cmd_cap, check=True, capture_output=True, text=True)
+    logger.info("Final video created: %s", final_video)
+    if not check_audio_stream(final_video):
+        raise RuntimeError(f"Audio missing in final video {final_video}")
 
     # Verify final video
     final_duration = get_audio_duration(final_video)
-    print(f"Video saved to: {os.path.abspath(final_video)} with duration {final_duration}s")
+    logger.info("Video saved to: %s with duration %ss", os.path.abspath(final_video), final_duration)
 
     # Optional: Clean up temp directory (uncomment to enable)
     # shutil.rmtree(temp_dir)
-    # print(f"Cleaned up temporary directory: {temp_dir}")
+    # logger.info("Cleaned up temporary directory: %s", temp_dir)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file